@@ -9,7 +9,10 @@ Purpose: Coordinate the complete ETL process for the data warehouse
 import logging
 import sys
 import os
-import traceback
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -30,88 +33,307 @@ logging.basicConfig(
 
 logger = logging.getLogger('inkwave.etl.main')
 
+# Target staging table for each CSV source, and the staging column each CSV
+# column is loaded into, in bind order (the SOURCE_SCHEMAS order the
+# extractor yields columns in)
+TABLE_SCHEMA = {
+    'raw_daily': ('STG_RAW_DAILY', {
+        'DateID': 'date_stamp',
+        'StnCode': 'stn_code',
+        'PD': 'pd',
+        'BC': 'bc',
+        'US': 'us',
+        'RV': 'rv',
+        'Rev': 'rev',
+        'Tmp': 'tmp',
+        'Hmd': 'hmd',
+        'VScr': 'vscr',
+        'Typ': 'typ',
+        'Notes': 'notes'
+    }),
+    'raw_sales': ('STG_RAW_SALES', {
+        'SaleNum': 'sale_num',
+        'DateStamp': 'date_stamp',
+        'EdID': 'ed_id',
+        'Chnl': 'chnl',
+        'TQty': 'tqty',
+        'UPrice': 'uprice',
+        'Curr': 'curr',
+        'Dscnt': 'dscnt',
+        'PD': 'pd',
+        'BC': 'bc',
+        'VScr': 'vscr',
+        'Typ': 'typ'
+    }),
+    'raw_meta': ('STG_RAW_META', {
+        'station/id': 'station_id',
+        'station/name': 'station_name',
+        'station/region': 'station_region',
+        'station/mgr': 'station_mgr',
+        'station/address': 'station_address',
+        'vendor/id': 'vendor_id',
+        'vendor/name': 'vendor_name',
+        'vendor/score': 'vendor_score',
+        'vendor/services/0/type': 'vendor_svc_type_1',
+        'vendor/services/0/qual': 'vendor_svc_qual_1',
+        'vendor/services/1/type': 'vendor_svc_type_2',
+        'vendor/services/1/qual': 'vendor_svc_qual_2',
+        'publication/ed': 'publication_ed',
+        'publication/title': 'publication_title',
+        'publication/cat': 'publication_cat',
+        'publication/lang': 'publication_lang',
+        'publication/author': 'publication_author',
+        'author/id': 'author_id',
+        'author/first_name': 'author_first_name',
+        'author/last_name': 'author_last_name',
+        'author/country': 'author_country',
+        'author/primary_genre': 'author_primary_genre'
+    })
+}
 
-def extract_data():
+# INSERT statements built once so every executemany reuses the same SQL text
+# and hits the Oracle statement cache
+INSERT_SQL = {
+    source_name: (
+        f"INSERT INTO {table_name} ({', '.join(columns.values())}) "
+        f"VALUES ({', '.join(f':{i + 1}' for i in range(len(columns)))})"
+    )
+    for source_name, (table_name, columns) in TABLE_SCHEMA.items()
+}
+
+# Direct-path variants: APPEND_VALUES makes each array insert a write above the
+# high water mark, bypassing the buffer cache and undo; the table then cannot
+# be modified again until the transaction commits, so these statements are
+# executed with a commit per chunk.
+DIRECT_PATH_INSERT_SQL = {
+    source_name: sql.replace('INSERT INTO', 'INSERT /*+ APPEND_VALUES */ INTO', 1)
+    for source_name, sql in INSERT_SQL.items()
+}
+
+# Rows per chunk read by the staging producers
+STAGE_CHUNKSIZE = 50_000
+
+# Chunks buffered between each CSV reader and its database writer
+STAGE_QUEUE_SIZE = 4
+
+
+def produce_chunks(iter_chunks, chunk_queue, stop_event, errors):
+    """
+    Read one source and put its chunks on that source's staging queue
+    """
+    try:
+        for chunk in iter_chunks(chunksize=STAGE_CHUNKSIZE):
+            if stop_event.is_set():
+                break
+            # Blocks while the queue is full, throttling the reader to the writer
+            chunk_queue.put(chunk)
+    except Exception as e:
+        errors.append(e)
+        stop_event.set()
+    finally:
+        # Sentinel: the source is finished
+        chunk_queue.put(None)
+
+
+def check_chunk_schema(source_name, chunk):
     """
-    Extract data from all CSV sources
+    Check that a chunk's columns line up with the staging INSERT binds
+    
+    Binds are positional, so the CSV columns are matched by name against
+    TABLE_SCHEMA: a missing, extra or reordered column would shift values into
+    the wrong staging column. Date columns must still be raw strings, since
+    the staging tables keep them as VARCHAR2 date_stamp values.
     """
-    logger.info("Starting data extraction process")
+    table_name, columns = TABLE_SCHEMA[source_name]
     
-    extractor = CSVExtractor()
+    if list(chunk.columns) != list(columns):
+        missing = [col for col in columns if col not in chunk.columns]
+        unexpected = [col for col in chunk.columns if col not in columns]
+        raise ValueError(
+            f"{source_name}: columns do not match {table_name} bind order "
+            f"(missing: {missing}, unexpected: {unexpected}, read: {list(chunk.columns)})"
+        )
     
-    try:
-        # Extract all sources
-        sources = extractor.extract_all_sources()
-        
-        # Validate data quality for each source
-        for source_name, (df, metadata) in sources.items():
-            logger.info(f"Validating data quality for {source_name}")
-            validation_results = extractor.validate_data_quality(df, source_name)
-            
-            if validation_results['errors']:
-                logger.warning(f"Data quality errors found in {source_name}:")
-                for error in validation_results['errors']:
-                    logger.warning(f"  - {error}")
-            
-            if validation_results['warnings']:
-                logger.info(f"Data quality warnings for {source_name}:")
-                for warning in validation_results['warnings']:
-                    logger.info(f"  - {warning}")
+    datetime_cols = [col for col, dtype in chunk.dtypes.items() if dtype.kind == 'M']
+    if datetime_cols:
+        raise ValueError(f"{source_name}: date columns must be staged as text: {datetime_cols}")
+
+
+def stage_source(pool, source_name, iter_chunks, stop_event, direct_path=False):
+    """
+    Stage one source into its own staging table
+    
+    A producer thread reads the source into a bounded queue while the calling
+    thread drains it into Oracle, so CSV parsing overlaps with inserts. Returns
+    the number of rows inserted; a failure sets stop_event so the other sources
+    stop early, and is re-raised once the producer has finished.
+    
+    The source is staged on one session, and each chunk is committed just
+    before the next one is inserted. The last chunk is only committed once the
+    producer has read the whole source, so an error raised at the end of the
+    stream (such as a failed validation) or by another source rolls it back.
+    
+    With direct_path, each chunk is inserted by a single APPEND_VALUES
+    executemany: every direct-path insert starts new blocks above the high
+    water mark, so splitting a chunk into commit_interval batches would waste
+    space. Batch error mode is off for these inserts, since Oracle does not
+    support it for direct-path loads. Otherwise a conventional INSERT is bound
+    in commit_interval batches.
+    """
+    table_name, _ = TABLE_SCHEMA[source_name]
+    insert_sql = DIRECT_PATH_INSERT_SQL[source_name] if direct_path else INSERT_SQL[source_name]
+    batch_size = ETL_CONFIG['commit_interval']
+    logger.info("Staging data from %s", source_name)
+    
+    chunk_queue = queue.Queue(maxsize=STAGE_QUEUE_SIZE)
+    errors = []
+    producer = threading.Thread(
+        target=produce_chunks, name=f"extract-{source_name}",
+        args=(iter_chunks, chunk_queue, stop_event, errors)
+    )
+    
+    total_inserted = 0
+    pending_rows = 0
+    schema_checked = False
+    # Raising inside the block rolls back the uncommitted chunk
+    with pool.get_connection() as conn:
+        producer.start()
+        try:
+            while True:
+                chunk = chunk_queue.get()
+                if chunk is None:
+                    break
+                
+                # Keep draining after a failure so the producer never blocks on a full queue
+                if stop_event.is_set():
+                    continue
+                
+                try:
+                    # Schema is fixed per source, so checking the first chunk is enough
+                    if not schema_checked:
+                        check_chunk_schema(source_name, chunk)
+                        schema_checked = True
+                    
+                    # Commit the previous chunk; a direct-path insert must also be
+                    # committed before the table can be loaded again
+                    if pending_rows:
+                        conn.commit()
+                        pending_rows = 0
+                    
+                    # Batch insert the chunk through columnar binds
+                    pending_rows = pool.execute_dataframe(
+                        insert_sql, chunk, len(chunk) if direct_path else batch_size,
+                        batch_errors=not direct_path, connection=conn
+                    )
+                    total_inserted += pending_rows
+                except Exception as e:
+                    errors.append(e)
+                    stop_event.set()
+        finally:
+            producer.join()
         
-        logger.info("Data extraction completed successfully")
-        return sources
+        if errors:
+            raise errors[0]
         
-    except Exception as e:
-        logger.error(f"Data extraction failed: {str(e)}")
-        logger.error(traceback.format_exc())
-        raise
+        if stop_event.is_set():
+            # Another source failed, so the last chunk is not kept either
+            conn.rollback()
+            total_inserted -= pending_rows
+            logger.warning("Staging of %s stopped after %d records", source_name, total_inserted)
+        else:
+            logger.info("Staged %d records from %s to %s", total_inserted, source_name, table_name)
+    return total_inserted
+
+
+def prepare_staging_tables(pool, table_names, prepared):
+    """
+    Switch staging tables to NOLOGGING and disable their non-unique indexes
+    ahead of a direct-path load
+    
+    The logging mode each table had is recorded in prepared before the table
+    is altered, so a failure part way through still leaves every table that
+    needs restoring, and how.
+    """
+    for table_name in table_names:
+        prepared[table_name] = pool.get_table_logging(table_name)
+        pool.set_table_logging(table_name, False)
+        pool.set_indexes_usable(table_name, False)
+
+
+def restore_staging_tables(pool, prepared):
+    """
+    Rebuild staging table indexes and put back the logging mode each table
+    had before the load
+    """
+    for table_name, was_logging in prepared.items():
+        try:
+            pool.set_indexes_usable(table_name, True)
+            pool.set_table_logging(table_name, was_logging)
+        except Exception as e:
+            logger.exception("Failed to restore staging table %s: %s", table_name, e)
 
 
-def stage_data(sources):
+def stage_data(extractor, sources, direct_path=False, fail_on_error=True):
     """
-    Stage extracted data in the database
+    Extract, validate and stage data in the database in a single pass
+    
+    Each source is staged by its own worker thread, so the staging tables load
+    in parallel on separate pooled sessions. Within a worker, a producer thread
+    reads the source into a bounded queue, so CSV parsing overlaps with
+    database inserts and memory stays bounded by STAGE_QUEUE_SIZE chunks per
+    source. Chunks are validated by the producer as they are read, so every
+    file is parsed only once.
+    
+    With direct_path, the staging tables are loaded with APPEND_VALUES inserts,
+    NOLOGGING and with their non-unique indexes unusable, and both are
+    restored to their previous state once the load ends; without it (the
+    default), conventional inserts are used.
+    Staging data is rebuildable from the CSV sources, so skipping redo is safe.
+    
+    With fail_on_error, a source with data quality errors fails the run before
+    its last chunk is committed.
     """
     logger.info("Starting data staging process")
     
     pool = get_connection_pool()
     
     try:
-        # Process each source
-        for source_name, (df, metadata) in sources.items():
-            logger.info(f"Staging data from {source_name}")
-            
-            # Convert DataFrame to list of tuples for database insertion
-            data_tuples = [tuple(row) for row in df.values]
-            
-            # Determine target table based on source
-            if source_name == 'raw_daily':
-                table_name = 'STG_RAW_DAILY'
-                columns = ', '.join(df.columns)
-            elif source_name == 'raw_sales':
-                table_name = 'STG_RAW_SALES'
-                columns = ', '.join(df.columns)
-            elif source_name == 'raw_meta':
-                table_name = 'STG_RAW_META'
-                columns = ', '.join(df.columns)
-            else:
-                logger.warning(f"Unknown source: {source_name}")
+        staged_sources = {}
+        for source_name in sources:
+            if source_name not in TABLE_SCHEMA:
+                logger.warning("Unknown source: %s", source_name)
                 continue
+            staged_sources[source_name] = partial(extractor.iter_validated, source_name,
+                                                  fail_on_error=fail_on_error)
+        
+        stop_event = threading.Event()
+        
+        table_names = [TABLE_SCHEMA[source_name][0] for source_name in staged_sources]
+        prepared_tables = {}
+        
+        try:
+            if direct_path:
+                prepare_staging_tables(pool, table_names, prepared_tables)
             
-            # Create INSERT statement
-            placeholders = ', '.join([':' + str(i+1) for i in range(len(df.columns))])
-            insert_sql = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
-            
-            # Batch insert data
-            batch_size = ETL_CONFIG['commit_interval']
-            total_inserted = pool.execute_batch(insert_sql, data_tuples, batch_size)
+            # One worker per staging table; sessions come from the shared pool
+            with ThreadPoolExecutor(max_workers=max(1, len(staged_sources)),
+                                    thread_name_prefix='stage') as executor:
+                futures = [
+                    executor.submit(stage_source, pool, source_name, iter_chunks,
+                                    stop_event, direct_path)
+                    for source_name, iter_chunks in staged_sources.items()
+                ]
             
-            logger.info(f"Staged {total_inserted} records from {source_name} to {table_name}")
+            # Surface the first failure, in source order
+            for future in futures:
+                future.result()
+        finally:
+            restore_staging_tables(pool, prepared_tables)
         
         logger.info("Data staging completed successfully")
         
     except Exception as e:
-        logger.error(f"Data staging failed: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Data staging failed: %s", e)
         raise
     finally:
         close_connection_pool()
@@ -144,11 +366,12 @@ def main():
     logger.info("=" * 60)
     
     try:
-        # Step 1: Extract data from sources
-        sources = extract_data()
+        # Step 1: Locate CSV sources
+        extractor = CSVExtractor()
+        sources = extractor.extract_all_sources()
         
-        # Step 2: Stage data in database
-        stage_data(sources)
+        # Step 2: Extract, validate and stage each source in one streaming pass
+        stage_data(extractor, sources)
         
         # Step 3: Transform and load (dimensional model loading)
         transform_and_load()
@@ -167,8 +390,7 @@ def main():
         logger.error("=" * 60)
         logger.error("ETL PROCESS FAILED")
         logger.error("=" * 60)
-        logger.error(f"Error: {str(e)}")
-        logger.error(traceback.format_exc())
+        logger.exception("Error: %s", e)
         logger.error("=" * 60)
         return False
 
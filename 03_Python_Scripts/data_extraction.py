@@ -5,152 +5,520 @@ Date: 2025-12-07
 Purpose: Extract and validate data from CSV source files
 """
 
+import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
+from contextlib import closing
+from functools import partial
+import csv
 import os
 
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from config.config import SOURCE_FILES, DATA_QUALITY_RULES, ETL_CONFIG
 
 logger = logging.getLogger('inkwave.extractors.csv')
 
+# Rows per DataFrame chunk when streaming CSV sources
+DEFAULT_CHUNKSIZE = 100_000
+
+# Bytes tokenized per block by the PyArrow CSV reader
+ARROW_BLOCK_SIZE = 8 << 20
+
+# Arrow-backed pandas columns (pd.ArrowDtype) need pandas 2.0 or later
+PANDAS_ARROW_DTYPES = int(pd.__version__.split('.')[0]) >= 2
+
+# Rows from which the numeric checks run as one compiled Numba pass per column
+# instead of separate pandas reductions. Kept well below the streamed chunk
+# sizes (DEFAULT_CHUNKSIZE here, STAGE_CHUNKSIZE in the ETL script) so every
+# full chunk takes the compiled path; only small frames stay on pandas.
+NUMBA_MIN_ROWS = 10_000
+
+# Column dtypes for each CSV source, passed to read_csv so pandas skips type
+# inference. Measures are float64 so NULLs do not force an upcast, low
+# cardinality codes are categories, and date columns stay as raw strings
+# because the sources mix formats (see parse_date_column). Measures with a
+# numeric_columns rule are read as text and converted afterwards, so a stray
+# non-numeric value is counted by validation instead of failing the read
+# (see CSVExtractor._read_schema).
+SOURCE_SCHEMAS = {
+    'raw_daily': {
+        'DateID': str,
+        'StnCode': 'category',
+        'PD': 'float64',
+        'BC': 'float64',
+        'US': 'float64',
+        'RV': 'float64',
+        'Rev': 'float64',
+        'Tmp': 'float64',
+        'Hmd': 'float64',
+        'VScr': 'float64',
+        'Typ': 'category',
+        'Notes': str
+    },
+    'raw_sales': {
+        'SaleNum': str,
+        'DateStamp': str,
+        'EdID': 'category',
+        'Chnl': 'category',
+        'TQty': 'float64',
+        'UPrice': 'float64',
+        'Curr': 'category',
+        'Dscnt': 'float64',
+        'PD': 'float64',
+        'BC': 'float64',
+        'VScr': 'float64',
+        'Typ': 'category'
+    },
+    'raw_meta': {
+        'station/id': str,
+        'station/name': str,
+        'station/region': str,
+        'station/mgr': str,
+        'station/address': str,
+        'vendor/id': str,
+        'vendor/name': str,
+        'vendor/score': 'float64',
+        'vendor/services/0/type': str,
+        'vendor/services/0/qual': str,
+        'vendor/services/1/type': str,
+        'vendor/services/1/qual': str,
+        'publication/ed': str,
+        'publication/title': str,
+        'publication/cat': str,
+        'publication/lang': str,
+        'publication/author': str,
+        'author/id': str,
+        'author/first_name': str,
+        'author/last_name': str,
+        'author/country': str,
+        'author/primary_genre': str
+    }
+}
+
+
+def _arrow_type(dtype) -> 'pa.DataType':
+    """
+    Map a SOURCE_SCHEMAS pandas dtype to the equivalent Arrow type.
+    
+    Args:
+        dtype: pandas dtype (str, 'float64' or 'category')
+        
+    Returns:
+        Arrow data type
+    """
+    if dtype == 'category':
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype is str:
+        return pa.string()
+    return pa.from_numpy_dtype(dtype)
+
+
+def _arrow_types_mapper(arrow_type: 'pa.DataType') -> Optional['pd.ArrowDtype']:
+    """
+    Map an Arrow column type to an Arrow-backed pandas dtype.
+    
+    Dictionary columns are left to pyarrow so they still become pandas
+    categoricals, whose isin only compares the handful of distinct codes.
+    
+    Args:
+        arrow_type: Arrow data type of a record batch column
+        
+    Returns:
+        pandas ArrowDtype, or None for the default conversion
+    """
+    if pa.types.is_dictionary(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath: it lets LLVM assume values are never NaN and fold the
+    # isnan test away, so non-numeric values would go uncounted. Serial, not
+    # parallel=True: staging already validates each source on its own thread,
+    # and Numba's default workqueue threading layer aborts the process when
+    # parallel kernels are entered from several threads at once.
+    @njit(cache=True)
+    def _validate_numeric_jit(a, lo, hi):
+        """
+        Count NaN, negative and out-of-range values in a single pass.
+        
+        Args:
+            a: float64 column values
+            lo: Lower range bound
+            hi: Upper range bound
+            
+        Returns:
+            Tuple of (negative, out of range, non-numeric) counts
+        """
+        neg = 0
+        oor = 0
+        nnum = 0
+        for i in range(a.shape[0]):
+            v = a[i]
+            if np.isnan(v):
+                nnum += 1
+            else:
+                if v < 0:
+                    neg += 1
+                if v < lo or v > hi:
+                    oor += 1
+        return neg, oor, nnum
+
+
+def _count_numeric_issues_jit(df: pd.DataFrame, rules: Dict) -> Dict[Tuple[str, str], int]:
+    """
+    Count numeric, positive and range violations with the Numba kernel.
+    
+    Only columns with a numeric dtype are counted; any other checked column is
+    left for the pandas path in CSVExtractor._count_issues.
+    
+    Args:
+        df: DataFrame to validate
+        rules: Data quality rules for the source
+        
+    Returns:
+        Dictionary mapping (check, column) to number of failing rows
+    """
+    numeric_cols = set(rules.get('numeric_columns', []))
+    positive_cols = set(rules.get('positive_columns', []))
+    range_checks = rules.get('range_checks', {})
+    counts = {}
+    
+    for col in numeric_cols | positive_cols | set(range_checks):
+        if col not in df.columns or df[col].dtype.kind not in 'iuf':
+            continue
+        
+        lo, hi = range_checks.get(col, (-np.inf, np.inf))
+        values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+        neg, oor, nnum = _validate_numeric_jit(values, float(lo), float(hi))
+        
+        if col in numeric_cols:
+            counts[('numeric', col)] = int(nnum)
+        if col in positive_cols:
+            counts[('positive', col)] = int(neg)
+        if col in range_checks:
+            counts[('range', col)] = int(oor)
+    
+    return counts
+
 
 class CSVExtractor:
     """Extract and validate data from CSV files."""
     
-    def __init__(self):
-        """Initialize CSV extractor."""
+    def __init__(self, backend: str = 'pyarrow', arrow_dtypes: bool = True):
+        """
+        Initialize CSV extractor.
+        
+        Args:
+            backend: CSV parser to use ('pyarrow' or 'pandas'); falls back to
+                pandas when pyarrow is not installed
+            arrow_dtypes: With the pyarrow backend, keep string and numeric
+                columns Arrow-backed instead of converting them to NumPy;
+                ignored before pandas 2.0
+        """
+        if backend not in ('pyarrow', 'pandas'):
+            raise ValueError(f"Unknown CSV backend: {backend}")
+        
+        if backend == 'pyarrow' and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow not available - using pandas CSV parser")
+            backend = 'pandas'
+        
+        if backend == 'pyarrow' and arrow_dtypes and not PANDAS_ARROW_DTYPES:
+            logger.warning("pandas %s has no Arrow-backed dtypes - using NumPy dtypes",
+                           pd.__version__)
+            arrow_dtypes = False
+        
+        self.backend = backend
+        self.arrow_dtypes = backend == 'pyarrow' and arrow_dtypes
         self.source_files = SOURCE_FILES
         self.data_quality_rules = DATA_QUALITY_RULES
+        self.source_schemas = SOURCE_SCHEMAS
         self.date_formats = ETL_CONFIG['date_formats']
+        self._valid_value_cache = {}
+        self._metadata_cache = {}
+        self.validation_results = {}
     
-    def extract_raw_daily(self) -> Tuple[pd.DataFrame, Dict]:
+    def iter_raw_daily(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
         """
-        Extract data from raw_daily.csv.
+        Stream raw_daily.csv in chunks.
         
+        Args:
+            chunksize: Rows per chunk
+            
         Returns:
-            Tuple of (DataFrame, metadata dict)
+            Iterator of DataFrame chunks
         """
-        logger.info("Extracting raw_daily.csv")
-        
-        file_path = self.source_files['raw_daily']
+        return self.iter_source('raw_daily', chunksize)
+    
+    def iter_raw_sales(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        """
+        Stream raw_sales.csv in chunks.
         
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-            
-            # Basic validation
-            rules = self.data_quality_rules['raw_daily']
-            missing_cols = set(rules['required_columns']) - set(df.columns)
+        Args:
+            chunksize: Rows per chunk
             
-            if missing_cols:
-                logger.error(f"Missing required columns: {missing_cols}")
-                raise ValueError(f"Missing columns: {missing_cols}")
+        Returns:
+            Iterator of DataFrame chunks
+        """
+        return self.iter_source('raw_sales', chunksize)
+    
+    def iter_raw_meta(self, chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        """
+        Stream raw_meta.csv in chunks.
+        
+        Args:
+            chunksize: Rows per chunk
             
-            metadata = {
-                'file_name': os.path.basename(file_path),
-                'total_rows': len(df),
-                'columns': list(df.columns),
-                'extract_timestamp': datetime.now(),
-                'file_size_bytes': os.path.getsize(file_path)
-            }
+        Returns:
+            Iterator of DataFrame chunks
+        """
+        return self.iter_source('raw_meta', chunksize)
+    
+    def iter_source(self, source_name: str, 
+                    chunksize: int = DEFAULT_CHUNKSIZE) -> Iterator[pd.DataFrame]:
+        """
+        Stream a CSV source file in chunks so memory stays bounded by chunksize.
+        
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, raw_meta)
+            chunksize: Rows per chunk
             
-            logger.info(f"Extracted {len(df)} rows from raw_daily.csv")
-            return df, metadata
+        Yields:
+            DataFrame chunks of at most chunksize rows
+        """
+        file_path = self.source_files[source_name]
+        metadata = self._source_metadata(source_name)
+        file_name = metadata['file_name']
+        
+        logger.info("Extracting %s (%d bytes)", file_name, metadata['file_size_bytes'])
+        
+        schema, numeric_text_cols = self._read_schema(source_name)
+        total_rows = 0
+        
+        if self.backend == 'pyarrow':
+            chunks = self._read_arrow_chunks(file_path, schema, chunksize)
+        else:
+            chunks = self._read_pandas_chunks(file_path, schema, chunksize)
+        
+        try:
+            with closing(chunks):
+                # Basic validation, on the header: both parsers would otherwise
+                # fail on a missing schema column with their own error
+                rules = self.data_quality_rules.get(source_name, {})
+                expected_cols = set(rules.get('required_columns', [])) | set(schema or ())
+                missing_cols = expected_cols - set(self._read_header(file_path))
+                
+                if missing_cols:
+                    logger.error("Missing required columns: %s", missing_cols)
+                    raise ValueError(f"Missing columns: {missing_cols}")
+                
+                columns = list(schema) if schema else None
+                for chunk in chunks:
+                    # usecols keeps the file's column order; staging binds
+                    # by position, so always yield columns in schema order
+                    if columns and list(chunk.columns) != columns:
+                        chunk = chunk.reindex(columns=columns)
+                    
+                    total_rows += len(chunk)
+                    yield self._coerce_numeric(chunk, source_name, numeric_text_cols)
             
-        except Exception as e:
-            logger.error(f"Failed to extract raw_daily.csv: {str(e)}")
+        except Exception:
+            logger.exception("Failed to extract %s", file_name)
             raise
+        
+        logger.info("Extracted %d rows from %s", total_rows, file_name)
     
-    def extract_raw_sales(self) -> Tuple[pd.DataFrame, Dict]:
+    def _read_header(self, file_path: str) -> List[str]:
         """
-        Extract data from raw_sales.csv.
+        Read the column names from the first line of a CSV file.
         
+        Args:
+            file_path: Path to CSV file
+            
         Returns:
-            Tuple of (DataFrame, metadata dict)
+            List of column names
+        """
+        with open(file_path, encoding='utf-8', newline='') as f:
+            return next(csv.reader(f), [])
+    
+    def _read_schema(self, source_name: str) -> Tuple[Optional[Dict], List[str]]:
         """
-        logger.info("Extracting raw_sales.csv")
+        Get the column dtypes to read a source with.
         
-        file_path = self.source_files['raw_sales']
+        Columns with a numeric_columns rule are read as text rather than with
+        their SOURCE_SCHEMAS dtype, since one malformed value would otherwise
+        make the whole read fail.
         
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
-            
-            # Basic validation
-            rules = self.data_quality_rules['raw_sales']
-            missing_cols = set(rules['required_columns']) - set(df.columns)
-            
-            if missing_cols:
-                logger.error(f"Missing required columns: {missing_cols}")
-                raise ValueError(f"Missing columns: {missing_cols}")
-            
-            metadata = {
-                'file_name': os.path.basename(file_path),
-                'total_rows': len(df),
-                'columns': list(df.columns),
-                'extract_timestamp': datetime.now(),
-                'file_size_bytes': os.path.getsize(file_path)
-            }
-            
-            logger.info(f"Extracted {len(df)} rows from raw_sales.csv")
-            return df, metadata
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, raw_meta)
             
-        except Exception as e:
-            logger.error(f"Failed to extract raw_sales.csv: {str(e)}")
-            raise
+        Returns:
+            Tuple of (column dtypes or None, columns read as text to coerce)
+        """
+        schema = self.source_schemas.get(source_name)
+        if schema is None:
+            return None, []
+        
+        numeric_cols = self.data_quality_rules.get(source_name, {}).get('numeric_columns', [])
+        numeric_text_cols = [
+            col for col in numeric_cols
+            if col in schema and schema[col] not in (str, 'category')
+        ]
+        read_schema = {
+            col: (str if col in numeric_text_cols else dtype) for col, dtype in schema.items()
+        }
+        return read_schema, numeric_text_cols
     
-    def extract_raw_meta(self) -> Tuple[pd.DataFrame, Dict]:
+    def _coerce_numeric(self, chunk: pd.DataFrame, source_name: str,
+                        columns: List[str]) -> pd.DataFrame:
         """
-        Extract data from raw_meta.csv.
+        Convert columns read as text to their SOURCE_SCHEMAS numeric dtype.
+        
+        Values that are not numbers become NaN, which the numeric_columns
+        check counts and the staging insert binds as NULL.
         
+        Args:
+            chunk: DataFrame chunk
+            source_name: Name of source (raw_daily, raw_sales, raw_meta)
+            columns: Columns to convert
+            
         Returns:
-            Tuple of (DataFrame, metadata dict)
+            The chunk, with the columns converted in place
+        """
+        schema = self.source_schemas[source_name]
+        for col in columns:
+            if col in chunk.columns:
+                values = chunk[col]
+                dtype = schema[col]
+                if isinstance(values.dtype, pd.ArrowDtype):
+                    # to_numeric leaves unparseable Arrow strings as NaN rather
+                    # than null, so convert through NumPy and back to Arrow
+                    values = values.astype(object)
+                    dtype = pd.ArrowDtype(_arrow_type(dtype))
+                chunk[col] = pd.to_numeric(values, errors='coerce').astype(dtype)
+        return chunk
+    
+    def _source_metadata(self, source_name: str) -> Dict:
         """
-        logger.info("Extracting raw_meta.csv")
+        Get the metadata dict for a source file, built once per source.
         
-        file_path = self.source_files['raw_meta']
+        The file is stat'ed on first use only, so extract_all_sources and the
+        later streaming pass share the same dict.
         
-        try:
-            df = pd.read_csv(file_path, encoding='utf-8')
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, raw_meta)
             
-            metadata = {
+        Returns:
+            Dictionary with file name, size and extract timestamp
+        """
+        if source_name not in self._metadata_cache:
+            file_path = self.source_files[source_name]
+            st = os.stat(file_path)
+            self._metadata_cache[source_name] = {
                 'file_name': os.path.basename(file_path),
-                'total_rows': len(df),
-                'columns': list(df.columns),
                 'extract_timestamp': datetime.now(),
-                'file_size_bytes': os.path.getsize(file_path)
+                'file_size_bytes': st.st_size
             }
+        return self._metadata_cache[source_name]
+    
+    def _read_pandas_chunks(self, file_path: str, schema: Optional[Dict],
+                            chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV file in chunks with the pandas C parser.
+        
+        Args:
+            file_path: Path to CSV file
+            schema: Column dtypes, or None to let pandas infer them
+            chunksize: Rows per chunk
             
-            logger.info(f"Extracted {len(df)} rows from raw_meta.csv")
-            return df, metadata
+        Yields:
+            DataFrame chunks
+        """
+        with pd.read_csv(file_path, encoding='utf-8', chunksize=chunksize,
+                         dtype=schema, usecols=list(schema) if schema else None,
+                         engine='c', low_memory=False) as reader:
+            yield from reader
+    
+    def _read_arrow_chunks(self, file_path: str, schema: Optional[Dict],
+                           chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV file in chunks with the multithreaded PyArrow CSV reader.
+        
+        The file is tokenized into typed Arrow record batches and each batch
+        is converted to pandas in slices of at most chunksize rows. With
+        arrow_dtypes the slices keep their Arrow buffers rather than being
+        copied into NumPy and object arrays.
+        
+        Args:
+            file_path: Path to CSV file
+            schema: Column dtypes, or None to let Arrow infer them
+            chunksize: Rows per chunk
             
-        except Exception as e:
-            logger.error(f"Failed to extract raw_meta.csv: {str(e)}")
-            raise
+        Yields:
+            DataFrame chunks
+        """
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE,
+                                         encoding='utf-8')
+        if schema:
+            convert_options = pacsv.ConvertOptions(
+                column_types={col: _arrow_type(dtype) for col, dtype in schema.items()},
+                include_columns=list(schema),
+                strings_can_be_null=True
+            )
+        else:
+            convert_options = pacsv.ConvertOptions(strings_can_be_null=True)
+        
+        types_mapper = _arrow_types_mapper if self.arrow_dtypes else None
+        
+        reader = pacsv.open_csv(file_path, read_options=read_options,
+                                convert_options=convert_options)
+        try:
+            for batch in reader:
+                for offset in range(0, batch.num_rows, chunksize):
+                    yield batch.slice(offset, chunksize).to_pandas(types_mapper=types_mapper)
+        finally:
+            reader.close()
     
-    def extract_all_sources(self) -> Dict[str, Tuple[pd.DataFrame, Dict]]:
+    def extract_all_sources(self) -> Dict[str, Tuple[Callable[[], Iterator[pd.DataFrame]], Dict]]:
         """
-        Extract all CSV source files.
+        Prepare all CSV source files for streaming extraction.
+        
+        No file contents are read here; each source is returned as a factory
+        that opens a fresh chunk iterator when called.
         
         Returns:
-            Dictionary mapping source name to (DataFrame, metadata) tuple
+            Dictionary mapping source name to (iterator factory, metadata) tuple
         """
         logger.info("Starting extraction of all CSV sources")
         
         sources = {}
         
         try:
-            sources['raw_daily'] = self.extract_raw_daily()
-            sources['raw_sales'] = self.extract_raw_sales()
-            sources['raw_meta'] = self.extract_raw_meta()
+            for source_name in ('raw_daily', 'raw_sales', 'raw_meta'):
+                metadata = self._source_metadata(source_name)
+                sources[source_name] = (partial(self.iter_source, source_name), metadata)
             
-            total_rows = sum(df.shape[0] for df, _ in sources.values())
-            logger.info(f"Total rows extracted: {total_rows}")
+            total_bytes = sum(metadata['file_size_bytes'] for _, metadata in sources.values())
+            logger.info("Total bytes to extract: %d", total_bytes)
             
             return sources
             
-        except Exception as e:
-            logger.error(f"Failed to extract all sources: {str(e)}")
+        except Exception:
+            logger.exception("Failed to extract all sources")
             raise
     
     def parse_date_column(self, date_series: pd.Series) -> Tuple[pd.Series, pd.Series]:
@@ -163,101 +531,233 @@ class CSVExtractor:
         Returns:
             Tuple of (parsed dates Series, format detected Series)
         """
-        parsed_dates = pd.Series([None] * len(date_series))
-        formats_detected = pd.Series([''] * len(date_series))
+        date_strings = date_series.astype(str).str.strip().where(date_series.notna())
         
-        for idx, date_str in enumerate(date_series):
-            if pd.isna(date_str):
-                continue
-            
-            date_str = str(date_str).strip()
+        # Object dtype, so each parse keeps its own resolution and dates
+        # outside the datetime64[ns] range (e.g. 9999-12-31) still fit
+        parsed_dates = pd.Series(None, index=date_series.index, dtype=object)
+        formats_detected = pd.Series('', index=date_series.index)
+        
+        # Try each format on the values still unparsed; first match wins
+        for date_format in self.date_formats:
+            remaining = parsed_dates.isna() & date_strings.notna()
+            if not remaining.any():
+                break
             
+            parsed = pd.to_datetime(date_strings[remaining], format=date_format, errors='coerce')
+            matched = parsed.index[parsed.notna()]
+            parsed_dates.loc[matched] = parsed.loc[matched]
+            formats_detected.loc[matched] = date_format
+        
+        # Older pandas coerces dates outside the nanosecond range to NaT, so
+        # retry the few values left over one at a time
+        for idx in parsed_dates.index[parsed_dates.isna() & date_strings.notna()]:
+            date_str = date_strings[idx]
             for date_format in self.date_formats:
                 try:
-                    parsed_date = datetime.strptime(date_str, date_format)
-                    parsed_dates[idx] = parsed_date
+                    parsed_dates[idx] = datetime.strptime(date_str, date_format)
                     formats_detected[idx] = date_format
                     break
                 except ValueError:
                     continue
-            
-            if parsed_dates[idx] is None:
-                logger.warning(f"Could not parse date: {date_str}")
+            else:
+                logger.warning("Could not parse date: %s", date_str)
         
         return parsed_dates, formats_detected
     
-    def validate_data_quality(self, df: pd.DataFrame, source_name: str) -> Dict:
+    def _valid_value_sets(self, source_name: str) -> Dict[str, frozenset]:
         """
-        Validate data quality against rules.
+        Get categorical check values as frozensets, built once per source.
+        
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, etc.)
+            
+        Returns:
+            Dictionary mapping column name to frozenset of valid values
+        """
+        if source_name not in self._valid_value_cache:
+            checks = self.data_quality_rules[source_name].get('categorical_checks', {})
+            self._valid_value_cache[source_name] = {
+                col: frozenset(valid_values) for col, valid_values in checks.items()
+            }
+        return self._valid_value_cache[source_name]
+    
+    def _count_issues(self, df: pd.DataFrame, rules: Dict, 
+                      source_name: str) -> Dict[Tuple[str, str], int]:
+        """
+        Count rule violations in a DataFrame.
         
         Args:
             df: DataFrame to validate
+            rules: Data quality rules for the source
             source_name: Name of source (raw_daily, raw_sales, etc.)
             
         Returns:
-            Dictionary with validation results
+            Dictionary mapping (check, column) to number of failing rows
+        """
+        counts = {}
+        
+        # Large numeric columns get all three numeric checks in one pass
+        if NUMBA_AVAILABLE and len(df) >= NUMBA_MIN_ROWS:
+            counts.update(_count_numeric_issues_jit(df, rules))
+        
+        # Check numeric columns
+        for col in rules.get('numeric_columns', []):
+            if col in df.columns and ('numeric', col) not in counts:
+                counts[('numeric', col)] = int((~pd.to_numeric(df[col], errors='coerce').notna()).sum())
+        
+        # Check positive value constraints
+        for col in rules.get('positive_columns', []):
+            if col in df.columns and ('positive', col) not in counts:
+                counts[('positive', col)] = int((df[col] < 0).sum())
+        
+        # Check range constraints
+        for col, (min_val, max_val) in rules.get('range_checks', {}).items():
+            if col in df.columns and ('range', col) not in counts:
+                counts[('range', col)] = int(((df[col] < min_val) | (df[col] > max_val)).sum())
+        
+        # Check categorical values
+        if 'categorical_checks' in rules:
+            valid_sets = self._valid_value_sets(source_name)
+            for col in rules['categorical_checks']:
+                if col in df.columns:
+                    counts[('categorical', col)] = int((~df[col].isin(valid_sets[col])).sum())
+        
+        return counts
+    
+    def _build_results(self, source_name: str, total_rows: int,
+                       counts: Dict[Tuple[str, str], int]) -> Dict:
         """
-        logger.info(f"Validating data quality for {source_name}")
+        Turn violation counts into validation messages.
         
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, etc.)
+            total_rows: Number of rows validated
+            counts: Violation counts from _count_issues
+            
+        Returns:
+            Dictionary with validation results
+        """
         results = {
             'source': source_name,
-            'total_rows': len(df),
+            'total_rows': total_rows,
             'issues': [],
             'warnings': [],
             'errors': []
         }
         
-        if source_name not in self.data_quality_rules:
-            logger.warning(f"No validation rules defined for {source_name}")
-            return results
-        
-        rules = self.data_quality_rules[source_name]
+        rules = self.data_quality_rules.get(source_name, {})
         
-        # Check numeric columns
-        if 'numeric_columns' in rules:
-            for col in rules['numeric_columns']:
-                if col in df.columns:
-                    non_numeric = df[~pd.to_numeric(df[col], errors='coerce').notna()][col]
-                    if len(non_numeric) > 0:
-                        results['warnings'].append(
-                            f"{col}: {len(non_numeric)} non-numeric values"
-                        )
+        for col in rules.get('numeric_columns', []):
+            if counts.get(('numeric', col)):
+                results['warnings'].append(
+                    f"{col}: {counts[('numeric', col)]} non-numeric values"
+                )
         
-        # Check positive value constraints
-        if 'positive_columns' in rules:
-            for col in rules['positive_columns']:
-                if col in df.columns:
-                    negative_vals = df[df[col] < 0]
-                    if len(negative_vals) > 0:
-                        results['errors'].append(
-                            f"{col}: {len(negative_vals)} negative values (should be positive)"
-                        )
+        for col in rules.get('positive_columns', []):
+            if counts.get(('positive', col)):
+                results['errors'].append(
+                    f"{col}: {counts[('positive', col)]} negative values (should be positive)"
+                )
         
-        # Check range constraints
-        if 'range_checks' in rules:
-            for col, (min_val, max_val) in rules['range_checks'].items():
-                if col in df.columns:
-                    out_of_range = df[(df[col] < min_val) | (df[col] > max_val)]
-                    if len(out_of_range) > 0:
-                        results['warnings'].append(
-                            f"{col}: {len(out_of_range)} values out of range [{min_val}, {max_val}]"
-                        )
+        for col, (min_val, max_val) in rules.get('range_checks', {}).items():
+            if counts.get(('range', col)):
+                results['warnings'].append(
+                    f"{col}: {counts[('range', col)]} values out of range [{min_val}, {max_val}]"
+                )
         
-        # Check categorical values
-        if 'categorical_checks' in rules:
-            for col, valid_values in rules['categorical_checks'].items():
-                if col in df.columns:
-                    invalid_vals = df[~df[col].isin(valid_values)]
-                    if len(invalid_vals) > 0:
-                        results['errors'].append(
-                            f"{col}: {len(invalid_vals)} invalid values (expected: {valid_values})"
-                        )
+        for col, valid_values in rules.get('categorical_checks', {}).items():
+            if counts.get(('categorical', col)):
+                results['errors'].append(
+                    f"{col}: {counts[('categorical', col)]} invalid values (expected: {valid_values})"
+                )
         
         # Summary
         results['issues'] = results['warnings'] + results['errors']
-        logger.info(f"Validation complete: {len(results['warnings'])} warnings, {len(results['errors'])} errors")
         
         return results
+    
+    def validate_data_quality(self, df: pd.DataFrame, source_name: str) -> Dict:
+        """
+        Validate data quality against rules.
+        
+        Args:
+            df: DataFrame to validate
+            source_name: Name of source (raw_daily, raw_sales, etc.)
+            
+        Returns:
+            Dictionary with validation results
+        """
+        logger.info("Validating data quality for %s", source_name)
+        
+        if source_name not in self.data_quality_rules:
+            logger.warning("No validation rules defined for %s", source_name)
+            return self._build_results(source_name, len(df), {})
+        
+        counts = self._count_issues(df, self.data_quality_rules[source_name], source_name)
+        results = self._build_results(source_name, len(df), counts)
+        
+        logger.info("Validation complete: %d warnings, %d errors",
+                    len(results['warnings']), len(results['errors']))
+        
+        return results
+    
+    def iter_validated(self, source_name: str, 
+                       chunksize: int = DEFAULT_CHUNKSIZE,
+                       fail_on_error: bool = False) -> Iterator[pd.DataFrame]:
+        """
+        Stream a source, validating each chunk as it is read.
+        
+        Each chunk is checked while it is still in cache and handed straight
+        to the caller, so the file is read only once for validation and
+        loading. Violation counts are summed across chunks; once the stream
+        is exhausted the aggregated results are logged and stored in
+        self.validation_results[source_name].
+        
+        With fail_on_error, a ValueError is raised after the last chunk if
+        any error-level rule was violated, so a consumer that commits only
+        once the stream ends can discard the load.
+        
+        Args:
+            source_name: Name of source (raw_daily, raw_sales, raw_meta)
+            chunksize: Rows per chunk
+            fail_on_error: Raise once the source is read if validation failed
+            
+        Yields:
+            DataFrame chunks of at most chunksize rows
+        """
+        rules = self.data_quality_rules.get(source_name)
+        if rules is None:
+            logger.warning("No validation rules defined for %s", source_name)
+        
+        total_rows = 0
+        counts = {}
+        
+        for chunk in self.iter_source(source_name, chunksize):
+            if rules is not None:
+                for key, count in self._count_issues(chunk, rules, source_name).items():
+                    counts[key] = counts.get(key, 0) + count
+            total_rows += len(chunk)
+            yield chunk
+        
+        results = self._build_results(source_name, total_rows, counts)
+        self.validation_results[source_name] = results
+        
+        if results['errors']:
+            logger.warning("Data quality errors found in %s:", source_name)
+            for error in results['errors']:
+                logger.warning("  - %s", error)
+        
+        if results['warnings'] and logger.isEnabledFor(logging.INFO):
+            logger.info("Data quality warnings for %s:", source_name)
+            for warning in results['warnings']:
+                logger.info("  - %s", warning)
+        
+        logger.info("Validation complete for %s: %d rows, %d warnings, %d errors", source_name,
+                    total_rows, len(results['warnings']), len(results['errors']))
+        
+        if fail_on_error and results['errors']:
+            raise ValueError(f"{source_name} failed validation: {'; '.join(results['errors'])}")
 
 
 if __name__ == "__main__":
@@ -272,20 +772,33 @@ if __name__ == "__main__":
     try:
         sources = extractor.extract_all_sources()
         
-        for source_name, (df, metadata) in sources.items():
+        for source_name, (iter_chunks, metadata) in sources.items():
             print(f"\n{source_name}:")
-            print(f"  Rows: {metadata['total_rows']}")
-            print(f"  Columns: {len(metadata['columns'])}")
             print(f"  File size: {metadata['file_size_bytes']} bytes")
             
-            # Validate
-            validation = extractor.validate_data_quality(df, source_name)
-            print(f"  Warnings: {len(validation['warnings'])}")
-            print(f"  Errors: {len(validation['errors'])}")
+            total_rows = 0
+            warnings = 0
+            errors = 0
+            sample = None
+            
+            for chunk in iter_chunks():
+                total_rows += len(chunk)
+                if sample is None:
+                    sample = chunk.head(3)
+                
+                # Validate
+                validation = extractor.validate_data_quality(chunk, source_name)
+                warnings += len(validation['warnings'])
+                errors += len(validation['errors'])
+            
+            print(f"  Rows: {total_rows}")
+            print(f"  Warnings: {warnings}")
+            print(f"  Errors: {errors}")
             
             # Show first few rows
-            print(f"\n  Sample data:")
-            print(df.head(3).to_string(index=False))
+            if sample is not None:
+                print(f"\n  Sample data:")
+                print(sample.to_string(index=False))
         
         print("\n✓ Extraction complete")
         
@@ -6,23 +6,58 @@ Purpose: Database connection pool management with retry logic
 """
 
 import logging
-from typing import Optional, List, Dict, Any, Tuple
-from contextlib import contextmanager
+import numbers
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Iterable, Iterator
+from contextlib import contextmanager, nullcontext
+from itertools import chain, islice
+import threading
 import time
 
-# Note: In production, use: import oracledb as cx_Oracle
-# For this demo, we'll create a mock interface
+import pandas as pd
+
+# python-oracledb in its default thin mode talks to the database directly,
+# without the Oracle Client libraries. Without it we fall back to a mock interface
 try:
-    import cx_Oracle
+    import oracledb
     ORACLE_AVAILABLE = True
 except ImportError:
     ORACLE_AVAILABLE = False
-    logging.warning("cx_Oracle not available - using mock interface")
+    logging.warning("oracledb not available - using mock interface")
 
 from config.config import ORACLE_CONFIG, get_oracle_dsn, ETL_CONFIG
 
 logger = logging.getLogger('inkwave.oracle_connector')
 
+# Rows fetched per round trip for queries run through this module
+FETCH_ARRAY_SIZE = 10_000
+
+if ORACLE_AVAILABLE:
+    oracledb.defaults.arraysize = FETCH_ARRAY_SIZE
+    oracledb.defaults.prefetchrows = FETCH_ARRAY_SIZE
+
+# Statements cached per pooled session so repeated executemany calls skip the soft parse
+STATEMENT_CACHE_SIZE = 50
+
+# Session setup for pooled connections. Commits return without waiting for the
+# redo log flush: a crash can lose the last few commits, which is acceptable
+# because this pool only loads the rebuildable STG_RAW_* staging tables. Fact
+# and dimension loads run in the PL/SQL scripts on their own sessions.
+SESSION_INIT_SQL = "ALTER SESSION SET COMMIT_WRITE = 'BATCH,NOWAIT'"
+
+
+def _init_session(connection, requested_tag):
+    """
+    Session callback run by the pool when a new session is created.
+    
+    Args:
+        connection: Newly created connection
+        requested_tag: Tag requested on acquire (unused)
+    """
+    cursor = connection.cursor()
+    cursor.execute(SESSION_INIT_SQL)
+    cursor.close()
+
 
 class OracleConnectionPool:
     """
@@ -40,6 +75,8 @@ class OracleConnectionPool:
         self.pool = None
         self.retry_attempts = ETL_CONFIG['max_retries']
         self.retry_delay = ETL_CONFIG['retry_delay_seconds']
+        # Demo mode: database calls return defaults without touching Oracle
+        self._use_mock = not ORACLE_AVAILABLE
         
     def create_pool(self) -> bool:
         """
@@ -55,61 +92,79 @@ class OracleConnectionPool:
         try:
             dsn = get_oracle_dsn()
             
-            logger.info(f"Creating connection pool to {dsn}")
+            logger.info("Creating connection pool to %s", dsn)
             
-            self.pool = cx_Oracle.SessionPool(
+            self.pool = oracledb.create_pool(
                 user=self.config['user'],
                 password=self.config['password'],
                 dsn=dsn,
                 min=self.config['pool_min'],
                 max=self.config['pool_max'],
                 increment=self.config['pool_increment'],
-                encoding=self.config['encoding'],
-                threaded=True
+                homogeneous=True,
+                getmode=oracledb.POOL_GETMODE_WAIT,
+                stmtcachesize=STATEMENT_CACHE_SIZE,
+                session_callback=_init_session
             )
             
-            logger.info(f"Connection pool created successfully (min={self.config['pool_min']}, max={self.config['pool_max']})")
+            # Warm the minimum sessions now so the first operation is not
+            # paying for connect, authentication and session setup
+            connections = []
+            try:
+                for _ in range(self.config['pool_min']):
+                    connections.append(self.pool.acquire())
+            finally:
+                for connection in connections:
+                    self.pool.release(connection)
+            
+            logger.info("Connection pool created successfully (min=%d, max=%d)",
+                        self.config['pool_min'], self.config['pool_max'])
             return True
             
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {str(e)}")
+        except Exception:
+            logger.exception("Failed to create connection pool")
+            # Do not leave a half-initialized pool behind
+            self.close_pool()
             return False
     
     def close_pool(self):
-        """Close the connection pool."""
+        """Close the connection pool. Safe to call more than once."""
         if self.pool:
             try:
                 self.pool.close()
                 logger.info("Connection pool closed")
-            except Exception as e:
-                logger.error(f"Error closing connection pool: {str(e)}")
+            except Exception:
+                logger.exception("Error closing connection pool")
+            finally:
+                self.pool = None
     
     @contextmanager
-    def get_connection(self):
+    def get_connection(self, commit: bool = True):
         """
         Context manager to get a connection from the pool.
         
+        Args:
+            commit: Commit when the block exits without error; pass False
+                when the caller commits itself
+            
         Yields:
             Connection object
         """
-        if not ORACLE_AVAILABLE:
+        if self._use_mock:
             # Return mock connection for demo
             yield MockConnection()
             return
             
-        connection = None
-        try:
-            connection = self.pool.acquire()
-            yield connection
-            connection.commit()
-        except Exception as e:
-            if connection:
+        # The pooled connection is released back to the pool on exit
+        with self.pool.acquire() as connection:
+            try:
+                yield connection
+                if commit:
+                    connection.commit()
+            except Exception as e:
                 connection.rollback()
-            logger.error(f"Connection error: {str(e)}")
-            raise
-        finally:
-            if connection:
-                self.pool.release(connection)
+                logger.error("Connection error: %s", e)
+                raise
     
     def execute_query(self, query: str, params: Optional[Dict] = None, 
                      fetch_all: bool = True) -> List[Tuple]:
@@ -124,6 +179,9 @@ class OracleConnectionPool:
         Returns:
             List of result tuples
         """
+        if self._use_mock:
+            return [] if fetch_all else None
+        
         for attempt in range(self.retry_attempts):
             try:
                 with self.get_connection() as conn:
@@ -139,11 +197,11 @@ class OracleConnectionPool:
                     return results
                     
             except Exception as e:
-                logger.warning(f"Query attempt {attempt + 1} failed: {str(e)}")
+                logger.warning("Query attempt %d failed: %s", attempt + 1, e)
                 if attempt < self.retry_attempts - 1:
                     time.sleep(self.retry_delay)
                 else:
-                    logger.error(f"Query failed after {self.retry_attempts} attempts")
+                    logger.error("Query failed after %d attempts", self.retry_attempts)
                     raise
     
     def execute_dml(self, query: str, params: Optional[Dict] = None) -> int:
@@ -157,6 +215,9 @@ class OracleConnectionPool:
         Returns:
             Number of rows affected
         """
+        if self._use_mock:
+            return 0
+        
         for attempt in range(self.retry_attempts):
             try:
                 with self.get_connection() as conn:
@@ -167,56 +228,141 @@ class OracleConnectionPool:
                     return rows_affected
                     
             except Exception as e:
-                logger.warning(f"DML attempt {attempt + 1} failed: {str(e)}")
+                logger.warning("DML attempt %d failed: %s", attempt + 1, e)
                 if attempt < self.retry_attempts - 1:
                     time.sleep(self.retry_delay)
                 else:
-                    logger.error(f"DML failed after {self.retry_attempts} attempts")
+                    logger.error("DML failed after %d attempts", self.retry_attempts)
                     raise
     
-    def execute_batch(self, query: str, data: List[Tuple], 
-                     commit_interval: int = None) -> int:
+    def execute_batch(self, query: str, data: Iterable[Tuple], 
+                     commit_interval: int = None,
+                     input_sizes: Optional[List[Any]] = None,
+                     commit_per_chunk: bool = False,
+                     batch_errors: bool = True,
+                     connection: Any = None) -> int:
         """
-        Execute batch INSERT with periodic commits.
+        Execute batch INSERT using array binding.
+        
+        Rows are sent to the server in chunks of commit_interval via
+        executemany, so each chunk costs a single round trip. Rows rejected
+        by the server are reported individually through batch errors.
+        
+        By default the whole batch is committed once at the end, so a failure
+        rolls back every row of the call. Set commit_per_chunk to commit once
+        after each executemany instead (needed for direct-path inserts, which
+        also need batch_errors off: Oracle rejects batch error mode for them
+        with ORA-38910). When a connection is passed, the caller owns the
+        transaction and nothing is committed or rolled back here.
         
         Args:
             query: INSERT statement
-            data: List of tuples with row data
-            commit_interval: Commit after N rows
+            data: Iterable of tuples with row data (lists, generators and
+                DataFrame.itertuples() are all accepted)
+            commit_interval: Rows bound per executemany call
+            input_sizes: Bind types for cursor.setinputsizes (inferred from
+                the first row when omitted)
+            commit_per_chunk: Commit after every executemany call
+            batch_errors: Report rejected rows individually instead of
+                failing the whole executemany
+            connection: Connection to run on, inside the caller's transaction
             
         Returns:
             Total rows inserted
         """
+        if self._use_mock:
+            # Report the rows as inserted so demo runs show real counts
+            return sum(1 for _ in data)
+        
         if not commit_interval:
             commit_interval = ETL_CONFIG['commit_interval']
         
         total_inserted = 0
+        rows_sent = 0
         
-        with self.get_connection() as conn:
+        chunks = _chunked(data, commit_interval)
+        first_chunk = next(chunks, None)
+        
+        # Nothing to insert - skip acquiring a connection
+        if first_chunk is None:
+            return total_inserted
+        
+        owns_transaction = connection is None
+        if owns_transaction:
+            # Commits are issued here, so the context manager does not add another
+            conn_context = self.get_connection(commit=False)
+        else:
+            conn_context = nullcontext(connection)
+        
+        with conn_context as conn:
             cursor = conn.cursor()
+            cursor.arraysize = commit_interval
+            cursor.bindarraysize = commit_interval
+            cursor.setinputsizes(*(input_sizes or _infer_input_sizes(first_chunk[0])))
             
             try:
-                for i, row in enumerate(data, 1):
-                    cursor.execute(query, row)
-                    total_inserted += 1
+                for chunk in chain([first_chunk], chunks):
+                    cursor.executemany(query, chunk, batcherrors=batch_errors)
+                    total_inserted += cursor.rowcount
+                    
+                    if batch_errors:
+                        for error in cursor.getbatcherrors():
+                            logger.error("Batch insert rejected row %d: %s",
+                                         rows_sent + error.offset + 1, error.message)
                     
-                    if i % commit_interval == 0:
+                    rows_sent += len(chunk)
+                    if commit_per_chunk and owns_transaction:
                         conn.commit()
-                        logger.debug(f"Batch committed: {i} rows")
+                        logger.debug("Batch committed: %d rows", total_inserted)
                 
-                # Final commit
-                conn.commit()
-                logger.info(f"Batch insert complete: {total_inserted} rows")
+                # Single commit for the whole call
+                if not commit_per_chunk and owns_transaction:
+                    conn.commit()
+                logger.info("Batch insert complete: %d rows", total_inserted)
                 
-            except Exception as e:
-                conn.rollback()
-                logger.error(f"Batch insert failed at row {total_inserted + 1}: {str(e)}")
+            except Exception:
+                if owns_transaction:
+                    conn.rollback()
+                logger.exception("Batch insert failed after %d rows sent", rows_sent)
                 raise
             finally:
                 cursor.close()
         
         return total_inserted
     
+    def execute_dataframe(self, query: str, df: pd.DataFrame,
+                          commit_interval: int = None,
+                          commit_per_chunk: bool = False,
+                          batch_errors: bool = True,
+                          connection: Any = None) -> int:
+        """
+        Execute batch INSERT of a DataFrame using columnar binds.
+        
+        Each column is converted to native Python values in one vectorized
+        pass (missing values become NULL) and rows are zipped from those
+        column lists, instead of boxing every cell through df.values.
+        
+        Args:
+            query: INSERT statement with one bind per DataFrame column
+            df: DataFrame whose columns match the statement's bind order
+            commit_interval: Rows bound per executemany call
+            commit_per_chunk: Commit after every executemany call
+            batch_errors: Report rejected rows individually (see execute_batch)
+            connection: Connection to run on, inside the caller's transaction
+            
+        Returns:
+            Total rows inserted
+        """
+        if self._use_mock:
+            return len(df)
+        
+        columns = [_column_values(df[col]) for col in df.columns]
+        return self.execute_batch(query, zip(*columns), commit_interval,
+                                  input_sizes=infer_oracle_types(df.dtypes),
+                                  commit_per_chunk=commit_per_chunk,
+                                  batch_errors=batch_errors,
+                                  connection=connection)
+    
     def call_procedure(self, proc_name: str, params: List[Any]) -> Any:
         """
         Call stored procedure.
@@ -228,6 +374,9 @@ class OracleConnectionPool:
         Returns:
             Procedure result
         """
+        if self._use_mock:
+            return params
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
             result = cursor.callproc(proc_name, params)
@@ -265,6 +414,133 @@ class OracleConnectionPool:
         """
         result = self.execute_query(query, {'table_name': table_name}, fetch_all=False)
         return result[0] > 0 if result else False
+    
+    def get_table_logging(self, table_name: str) -> bool:
+        """
+        Check whether redo logging is enabled for a table.
+        
+        Args:
+            table_name: Table name
+            
+        Returns:
+            True if the table is LOGGING
+        """
+        query = """
+            SELECT logging 
+            FROM user_tables 
+            WHERE table_name = UPPER(:table_name)
+        """
+        result = self.execute_query(query, {'table_name': table_name}, fetch_all=False)
+        return result[0] != 'NO' if result else True
+    
+    def set_table_logging(self, table_name: str, enabled: bool):
+        """
+        Switch redo logging for direct-path loads into a table.
+        
+        Args:
+            table_name: Table name
+            enabled: True for LOGGING, False for NOLOGGING
+        """
+        if self._use_mock:
+            return
+        
+        mode = 'LOGGING' if enabled else 'NOLOGGING'
+        self.execute_dml(f"ALTER TABLE {table_name} {mode}")
+        logger.info("Table %s set to %s", table_name, mode)
+    
+    def set_indexes_usable(self, table_name: str, usable: bool):
+        """
+        Mark a table's non-unique indexes UNUSABLE before a bulk load, or
+        rebuild them afterwards. Unique indexes are left alone because
+        inserts into a table with an unusable unique index fail.
+        
+        Args:
+            table_name: Table name
+            usable: True to rebuild the indexes, False to mark them unusable
+        """
+        query = """
+            SELECT index_name 
+            FROM user_indexes 
+            WHERE table_name = UPPER(:table_name)
+              AND uniqueness = 'NONUNIQUE'
+        """
+        action = 'REBUILD' if usable else 'UNUSABLE'
+        
+        for (index_name,) in self.execute_query(query, {'table_name': table_name}):
+            self.execute_dml(f"ALTER INDEX {index_name} {action}")
+            logger.info("Index %s on %s: %s", index_name, table_name, action)
+
+
+def _chunked(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    """
+    Split an iterable of rows into lists of at most size rows.
+    
+    Args:
+        rows: Iterable of row tuples
+        size: Maximum rows per chunk
+        
+    Yields:
+        List of row tuples
+    """
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _infer_input_sizes(row: Tuple) -> List[Any]:
+    """
+    Derive setinputsizes() bind types from a sample row.
+    
+    Numeric columns are pinned to float so a leading NULL does not make the
+    driver bind the column as a string; other columns are left as None and
+    sized by the driver from the data.
+    
+    Args:
+        row: Sample row tuple
+        
+    Returns:
+        List of bind types, one per column
+    """
+    return [float if isinstance(value, numbers.Real) else None for value in row]
+
+
+def infer_oracle_types(dtypes: pd.Series) -> List[Any]:
+    """
+    Derive setinputsizes() bind types from DataFrame column dtypes.
+    
+    Args:
+        dtypes: DataFrame.dtypes
+        
+    Returns:
+        List of bind types, one per column (None lets the driver size it)
+    """
+    bind_types = []
+    for dtype in dtypes:
+        if dtype.kind in 'iuf':
+            bind_types.append(float)
+        elif dtype.kind == 'M':
+            bind_types.append(datetime)
+        else:
+            bind_types.append(None)
+    return bind_types
+
+
+def _column_values(series: pd.Series) -> List[Any]:
+    """
+    Convert a column to a list of bindable Python values.
+    
+    Args:
+        series: DataFrame column
+        
+    Returns:
+        List of values with missing entries as None
+    """
+    if series.hasnans or series.dtype.kind == 'M':
+        return series.astype(object).where(series.notna(), None).tolist()
+    return series.to_numpy().tolist()
 
 
 class MockConnection:
@@ -304,31 +580,42 @@ class MockCursor:
 
 # Global connection pool instance
 _connection_pool: Optional[OracleConnectionPool] = None
+_connection_pool_lock = threading.Lock()
 
 
 def get_connection_pool() -> OracleConnectionPool:
     """
     Get global connection pool instance (singleton pattern).
     
+    Safe to call from worker threads: the pool is created exactly once per
+    process and its sessions are shared by all callers. Raises RuntimeError if
+    the pool cannot be created; the failed pool is not cached, so a later call
+    tries again.
+    
     Returns:
         OracleConnectionPool instance
     """
     global _connection_pool
     
     if _connection_pool is None:
-        _connection_pool = OracleConnectionPool()
-        _connection_pool.create_pool()
+        with _connection_pool_lock:
+            if _connection_pool is None:
+                pool = OracleConnectionPool()
+                if not pool.create_pool():
+                    raise RuntimeError("Failed to create Oracle connection pool")
+                _connection_pool = pool
     
     return _connection_pool
 
 
 def close_connection_pool():
-    """Close global connection pool."""
+    """Close global connection pool. Idempotent: later calls do nothing."""
     global _connection_pool
     
-    if _connection_pool:
-        _connection_pool.close_pool()
-        _connection_pool = None
+    with _connection_pool_lock:
+        if _connection_pool:
+            _connection_pool.close_pool()
+            _connection_pool = None
 
 
 if __name__ == "__main__":
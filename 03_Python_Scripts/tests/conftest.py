@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import types
+
+# The ETL scripts import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _install_test_config():
+    """
+    Register a minimal config.config module so the ETL scripts import
+    without the deployment's config package (and its credentials)
+    """
+    config = types.ModuleType('config.config')
+    config.SOURCE_FILES = {}
+    config.DATA_QUALITY_RULES = {}
+    config.ETL_CONFIG = {
+        'commit_interval': 1000,
+        'max_retries': 1,
+        'retry_delay_seconds': 0,
+        'date_formats': ['%Y-%m-%d', '%d-%m-%Y', '%Y/%m/%d']
+    }
+    config.ORACLE_CONFIG = {
+        'user': 'inkwave_etl',
+        'password': 'test',
+        'pool_min': 1,
+        'pool_max': 4,
+        'pool_increment': 1
+    }
+    config.get_oracle_dsn = lambda: 'localhost:1521/XEPDB1'
+    
+    package = types.ModuleType('config')
+    package.config = config
+    sys.modules['config'] = package
+    sys.modules['config.config'] = config
+
+
+def _alias_script_modules():
+    """
+    data_analysis imports the extractor and connector under their deployed
+    module names, csv_extractor and oracle_connector
+    """
+    import data_extraction
+    import oracle_connection
+    
+    sys.modules.setdefault('csv_extractor', data_extraction)
+    sys.modules.setdefault('oracle_connector', oracle_connection)
+
+
+def _import_etl_script():
+    """
+    Import data_analysis from a scratch directory, since its logging setup
+    opens etl_process.log in the working directory
+    """
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix='inkwave-etl-'))
+    try:
+        import data_analysis  # noqa: F401
+    finally:
+        os.chdir(cwd)
+
+
+_install_test_config()
+_alias_script_modules()
+_import_etl_script()
@@ -0,0 +1,146 @@
+"""
+Tests for the staging pipeline in the ETL orchestration script
+"""
+
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+import pytest
+
+import data_analysis
+from data_extraction import SOURCE_SCHEMAS
+
+
+def _sales_chunk(columns=None):
+    columns = columns or list(SOURCE_SCHEMAS['raw_sales'])
+    return pd.DataFrame({col: ['1'] for col in columns})
+
+
+class FakeStagingPool:
+    """Records staging inserts, commits and rollbacks in call order."""
+    
+    def __init__(self, fail_on_insert=None):
+        self.calls = []
+        self.fail_on_insert = fail_on_insert
+    
+    @contextmanager
+    def get_connection(self):
+        connection = FakeConnection(self.calls)
+        try:
+            yield connection
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+    
+    def execute_dataframe(self, query, df, commit_interval, batch_errors, connection):
+        inserts = sum(1 for call in self.calls if call[0] == 'insert')
+        if inserts == self.fail_on_insert:
+            raise RuntimeError("insert failed")
+        self.calls.append(('insert', len(df), batch_errors))
+        return len(df)
+
+
+class FakeConnection:
+    def __init__(self, calls):
+        self.calls = calls
+    
+    def commit(self):
+        self.calls.append(('commit',))
+    
+    def rollback(self):
+        self.calls.append(('rollback',))
+
+
+def _source(chunks, error=None):
+    """Chunk iterator factory that optionally raises once exhausted."""
+    def iter_chunks(chunksize):
+        for _ in range(chunks):
+            yield _sales_chunk()
+        if error is not None:
+            raise error
+    return iter_chunks
+
+
+def _after_last_insert(calls):
+    inserts = [i for i, call in enumerate(calls) if call[0] == 'insert']
+    return calls[inserts[-1] + 1:] if inserts else calls
+
+
+def _producer_alive():
+    return any(thread.name == 'extract-raw_sales' for thread in threading.enumerate())
+
+
+def test_check_chunk_schema_accepts_schema_order():
+    data_analysis.check_chunk_schema('raw_sales', _sales_chunk())
+
+
+def test_check_chunk_schema_rejects_reordered_columns():
+    columns = list(SOURCE_SCHEMAS['raw_sales'])
+    columns[4], columns[5] = columns[5], columns[4]
+    
+    with pytest.raises(ValueError, match='bind order'):
+        data_analysis.check_chunk_schema('raw_sales', _sales_chunk(columns))
+
+
+def test_check_chunk_schema_rejects_renamed_column():
+    columns = ['SaleNo' if col == 'SaleNum' else col for col in SOURCE_SCHEMAS['raw_sales']]
+    
+    with pytest.raises(ValueError, match=r"missing: \['SaleNum'\], unexpected: \['SaleNo'\]"):
+        data_analysis.check_chunk_schema('raw_sales', _sales_chunk(columns))
+
+
+@pytest.mark.parametrize('direct_path', [False, True])
+def test_stage_source_commits_each_chunk_once(direct_path):
+    pool = FakeStagingPool()
+    
+    assert data_analysis.stage_source(pool, 'raw_sales', _source(3), threading.Event(),
+                                      direct_path=direct_path) == 3
+    
+    insert = ('insert', 1, not direct_path)
+    assert pool.calls == [insert, ('commit',)] * 3
+
+
+def test_stage_source_rolls_back_last_chunk_on_source_error():
+    pool = FakeStagingPool()
+    stop_event = threading.Event()
+    
+    with pytest.raises(ValueError, match='failed validation'):
+        data_analysis.stage_source(pool, 'raw_sales',
+                                   _source(2, ValueError('raw_sales failed validation')),
+                                   stop_event)
+    
+    assert _after_last_insert(pool.calls) == [('rollback',)]
+    assert stop_event.is_set()
+    assert not _producer_alive()
+
+
+def test_stage_source_insert_error_stops_producer():
+    # More chunks than the queue holds, so a stuck producer would hang the test
+    pool = FakeStagingPool(fail_on_insert=0)
+    stop_event = threading.Event()
+    
+    with pytest.raises(RuntimeError, match='insert failed'):
+        data_analysis.stage_source(pool, 'raw_sales',
+                                   _source(data_analysis.STAGE_QUEUE_SIZE * 3), stop_event)
+    
+    assert pool.calls == [('rollback',)]
+    assert stop_event.is_set()
+    assert not _producer_alive()
+
+
+def test_stage_source_rolls_back_when_another_source_fails():
+    pool = FakeStagingPool()
+    stop_event = threading.Event()
+    
+    def iter_chunks(chunksize):
+        yield _sales_chunk()
+        # Another source fails while this one is still being read
+        stop_event.set()
+        yield _sales_chunk()
+    
+    assert data_analysis.stage_source(pool, 'raw_sales', iter_chunks, stop_event) == 0
+    
+    # Anything inserted is rolled back before the session is released
+    assert _after_last_insert(pool.calls)[0] == ('rollback',)
@@ -0,0 +1,185 @@
+"""
+Tests for CSVExtractor reading and validating source files
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_extraction
+from data_extraction import CSVExtractor
+
+# raw_sales rows with a non-numeric UPrice in the second row
+DIRTY_SALES_CSV = """SaleNum,DateStamp,EdID,Chnl,TQty,UPrice,Curr,Dscnt,PD,BC,VScr,Typ
+S9612,27-07-2024,E123,CH001,131,29.27,EUR,0.13,762,2908.51,7.8,Paperback
+S3981,2023-07-17,E123,CH003,89,abc,USD,,1952,5540.18,9.5,Paperback
+S4410,2023-08-02,E124,CH002,40,12.50,GBP,0.05,310,1020.00,8.1,Hardcover
+"""
+
+SALES_RULES = {
+    'required_columns': ['SaleNum', 'DateStamp', 'TQty', 'UPrice'],
+    'numeric_columns': ['TQty', 'UPrice'],
+    'positive_columns': ['TQty', 'UPrice']
+}
+
+
+@pytest.fixture
+def dirty_sales_csv(tmp_path):
+    path = tmp_path / 'raw_sales.csv'
+    path.write_text(DIRTY_SALES_CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.fixture(params=['pandas', 'pyarrow'])
+def extractor(request, dirty_sales_csv):
+    if request.param == 'pyarrow':
+        pytest.importorskip('pyarrow')
+    extractor = CSVExtractor(backend=request.param)
+    extractor.source_files = {'raw_sales': dirty_sales_csv}
+    extractor.data_quality_rules = {'raw_sales': SALES_RULES}
+    return extractor
+
+
+def test_non_numeric_value_is_counted_not_fatal(extractor):
+    chunks = list(extractor.iter_validated('raw_sales', chunksize=2))
+    
+    assert sum(len(chunk) for chunk in chunks) == 3
+    results = extractor.validation_results['raw_sales']
+    assert results['warnings'] == ["UPrice: 1 non-numeric values"]
+    assert results['errors'] == []
+
+
+def test_fail_on_error_raises_after_last_chunk(extractor):
+    extractor.data_quality_rules = {
+        'raw_sales': dict(SALES_RULES, categorical_checks={'Curr': ['USD', 'EUR']})
+    }
+    chunks = []
+    
+    with pytest.raises(ValueError, match='raw_sales failed validation'):
+        for chunk in extractor.iter_validated('raw_sales', chunksize=2, fail_on_error=True):
+            chunks.append(chunk)
+    
+    # Every chunk is handed over before the error is raised
+    assert sum(len(chunk) for chunk in chunks) == 3
+    assert extractor.validation_results['raw_sales']['errors']
+
+
+def test_numeric_columns_are_coerced(extractor):
+    df = pd.concat(extractor.iter_source('raw_sales', chunksize=2), ignore_index=True)
+    
+    assert df['UPrice'].dtype.kind == 'f'
+    assert df['UPrice'].dtype == df['PD'].dtype
+    assert df['TQty'].dtype == df['PD'].dtype
+    assert df['UPrice'].isna().tolist() == [False, True, False]
+    assert df['UPrice'].iloc[2] == 12.5
+
+
+def test_columns_are_yielded_in_schema_order(extractor, dirty_sales_csv):
+    # Same data with TQty and UPrice swapped in the file
+    df = pd.read_csv(dirty_sales_csv, dtype=str)
+    columns = list(df.columns)
+    columns[4], columns[5] = columns[5], columns[4]
+    df[columns].to_csv(dirty_sales_csv, index=False)
+    
+    chunks = list(extractor.iter_source('raw_sales', chunksize=2))
+    
+    for chunk in chunks:
+        assert list(chunk.columns) == list(data_extraction.SOURCE_SCHEMAS['raw_sales'])
+    assert chunks[0]['TQty'].tolist() == [131, 89]
+    assert chunks[0]['UPrice'].iloc[0] == 29.27
+
+
+def test_missing_column_raises_value_error(extractor, dirty_sales_csv):
+    df = pd.read_csv(dirty_sales_csv, dtype=str)
+    df.drop(columns=['Curr']).to_csv(dirty_sales_csv, index=False)
+    
+    with pytest.raises(ValueError, match="Missing columns: {'Curr'}"):
+        list(extractor.iter_source('raw_sales'))
+
+
+def test_numba_counts_match_pandas(monkeypatch):
+    pytest.importorskip('numba')
+    
+    rng = np.random.default_rng(0)
+    rows = data_extraction.NUMBA_MIN_ROWS * 3
+    values = rng.normal(50, 100, rows)
+    values[rng.random(rows) < 0.4] = np.nan
+    df = pd.DataFrame({
+        'UPrice': values,
+        'TQty': rng.integers(-5, 200, rows),
+        'Chnl': pd.Series(rng.choice(['CH001', 'CH002'], rows), dtype='category')
+    })
+    rules = {
+        'numeric_columns': ['UPrice', 'TQty', 'Chnl'],
+        'positive_columns': ['UPrice', 'TQty'],
+        'range_checks': {'UPrice': (0, 100), 'TQty': (1, 150)}
+    }
+    
+    extractor = CSVExtractor(backend='pandas')
+    jit_counts = data_extraction._count_numeric_issues_jit(df, rules)
+    monkeypatch.setattr(data_extraction, 'NUMBA_AVAILABLE', False)
+    pandas_counts = extractor._count_issues(df, rules, 'raw_sales')
+    
+    assert jit_counts[('numeric', 'UPrice')] > 0
+    assert ('numeric', 'Chnl') not in jit_counts
+    assert {key: pandas_counts[key] for key in jit_counts} == jit_counts
+
+
+def test_concurrent_validation_matches_sequential(tmp_path):
+    pytest.importorskip('numba')
+    
+    # One copy of a large raw_sales file per source, validated from separate
+    # threads as stage_data does, with chunks big enough to use the kernel
+    rng = np.random.default_rng(1)
+    rows = data_extraction.NUMBA_MIN_ROWS * 2
+    sales = pd.DataFrame({
+        col: [1.0 if dtype == 'float64' else 'x'] * rows
+        for col, dtype in data_extraction.SOURCE_SCHEMAS['raw_sales'].items()
+    })
+    sales['TQty'] = rng.integers(-10, 300, rows)
+    sales['UPrice'] = np.where(rng.random(rows) < 0.1, 'abc', rng.normal(20, 30, rows).round(2))
+    
+    sources = ['raw_sales_a', 'raw_sales_b', 'raw_sales_c']
+    extractor = CSVExtractor(backend='pandas')
+    extractor.source_files = {}
+    for source_name in sources:
+        path = tmp_path / f'{source_name}.csv'
+        sales.to_csv(path, index=False)
+        extractor.source_files[source_name] = str(path)
+    extractor.source_schemas = {name: data_extraction.SOURCE_SCHEMAS['raw_sales'] for name in sources}
+    extractor.data_quality_rules = {
+        name: dict(SALES_RULES, range_checks={'TQty': (0, 250)}) for name in sources
+    }
+    
+    def validate(source_name):
+        for _ in extractor.iter_validated(source_name, chunksize=rows):
+            pass
+        return extractor.validation_results[source_name]
+    
+    expected = validate(sources[0])
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        results = list(executor.map(validate, sources * 2))
+    
+    assert expected['errors'] and expected['warnings']
+    for result in results:
+        assert result['errors'] == expected['errors']
+        assert result['warnings'] == expected['warnings']
+
+
+def test_parse_date_column_mixed_formats():
+    extractor = CSVExtractor(backend='pandas')
+    extractor.date_formats = ['%Y-%m-%d', '%d-%m-%Y', '%Y/%m/%d']
+    dates = pd.Series(['2023-07-17', '27-07-2024', ' 2023/01/24 ', '9999-12-31',
+                       '31/31/2023', None])
+    
+    parsed, formats = extractor.parse_date_column(dates)
+    
+    assert list(parsed[:4]) == [
+        datetime(2023, 7, 17), datetime(2024, 7, 27), datetime(2023, 1, 24),
+        datetime(9999, 12, 31)
+    ]
+    assert parsed[4:].isna().all()
+    assert list(formats) == ['%Y-%m-%d', '%d-%m-%Y', '%Y/%m/%d', '%Y-%m-%d', '', '']
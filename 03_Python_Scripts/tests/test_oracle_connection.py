@@ -0,0 +1,176 @@
+"""
+Tests for batch inserts through OracleConnectionPool, run against a fake driver
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oracle_connection import OracleConnectionPool, _column_values
+
+INSERT = "INSERT INTO stg_test (a, b) VALUES (:1, :2)"
+
+
+class FakeCursor:
+    """Records the calls made by execute_batch."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+        self.rowcount = 0
+        self.arraysize = None
+        self.bindarraysize = None
+    
+    def setinputsizes(self, *sizes):
+        self.connection.calls.append(('setinputsizes', list(sizes)))
+    
+    def executemany(self, query, rows, batcherrors=False):
+        if self.connection.fail_on_execute:
+            raise RuntimeError("ORA-00001: unique constraint violated")
+        self.connection.calls.append(('executemany', list(rows), batcherrors))
+        self.rowcount = len(rows)
+    
+    def getbatcherrors(self):
+        self.connection.calls.append(('getbatcherrors',))
+        return []
+    
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Pooled connection that records cursor calls, commits and rollbacks."""
+    
+    def __init__(self, fail_on_execute=False):
+        self.calls = []
+        self.fail_on_execute = fail_on_execute
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def cursor(self):
+        return FakeCursor(self)
+    
+    def commit(self):
+        self.calls.append(('commit',))
+    
+    def rollback(self):
+        self.calls.append(('rollback',))
+
+
+class FakeSessionPool:
+    """Stands in for an oracledb pool, handing out a single connection."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def acquire(self):
+        return self.connection
+
+
+@pytest.fixture
+def connection():
+    return FakeConnection()
+
+
+@pytest.fixture
+def pool(connection):
+    pool = OracleConnectionPool()
+    pool._use_mock = False
+    pool.pool = FakeSessionPool(connection)
+    return pool
+
+
+def _names(calls):
+    return [call[0] for call in calls]
+
+
+def test_execute_batch_chunks_rows_and_commits_once(pool, connection):
+    rows = [(i, f"row{i}") for i in range(5)]
+    
+    assert pool.execute_batch(INSERT, iter(rows), commit_interval=2) == 5
+    
+    batches = [call[1] for call in connection.calls if call[0] == 'executemany']
+    assert batches == [rows[0:2], rows[2:4], rows[4:5]]
+    assert _names(connection.calls).count('commit') == 1
+    assert connection.calls[-1] == ('commit',)
+
+
+def test_execute_batch_commit_per_chunk(pool, connection):
+    rows = [(i, 'x') for i in range(5)]
+    
+    pool.execute_batch(INSERT, rows, commit_interval=2, commit_per_chunk=True)
+    
+    # Exactly one commit after every executemany, and none on top
+    assert _names(connection.calls)[1:] == ['executemany', 'getbatcherrors', 'commit'] * 3
+
+
+def test_execute_batch_infers_input_sizes_from_first_row(pool, connection):
+    rows = [(1, 'a', 2.5, None), (None, 'b', None, datetime(2024, 1, 1))]
+    
+    pool.execute_batch(INSERT, rows)
+    
+    assert connection.calls[0] == ('setinputsizes', [float, None, float, None])
+
+
+def test_execute_batch_without_batch_errors(pool, connection):
+    pool.execute_batch(INSERT, [(1, 'a')], batch_errors=False)
+    
+    assert connection.calls[1] == ('executemany', [(1, 'a')], False)
+    assert 'getbatcherrors' not in _names(connection.calls)
+
+
+def test_execute_batch_on_caller_connection_leaves_transaction_open(pool):
+    caller_connection = FakeConnection()
+    
+    pool.execute_batch(INSERT, [(1, 'a'), (2, 'b')], commit_interval=1,
+                       commit_per_chunk=True, connection=caller_connection)
+    
+    assert 'commit' not in _names(caller_connection.calls)
+    assert _names(caller_connection.calls).count('executemany') == 2
+
+
+def test_execute_batch_rolls_back_on_failure():
+    connection = FakeConnection(fail_on_execute=True)
+    pool = OracleConnectionPool()
+    pool._use_mock = False
+    pool.pool = FakeSessionPool(connection)
+    
+    with pytest.raises(RuntimeError):
+        pool.execute_batch(INSERT, [(1, 'a')])
+    
+    assert 'commit' not in _names(connection.calls)
+    assert 'rollback' in _names(connection.calls)
+
+
+def test_execute_batch_skips_empty_data(pool, connection):
+    assert pool.execute_batch(INSERT, iter([])) == 0
+    assert connection.calls == []
+
+
+def test_execute_dataframe_binds_missing_values_as_null(pool, connection):
+    df = pd.DataFrame({
+        'qty': [1.5, np.nan],
+        'date': pd.to_datetime(['2024-01-01', None]),
+    })
+    
+    pool.execute_dataframe(INSERT, df)
+    
+    assert connection.calls[0] == ('setinputsizes', [float, datetime])
+    assert connection.calls[1][1] == [(1.5, datetime(2024, 1, 1)), (None, None)]
+
+
+def test_column_values():
+    assert _column_values(pd.Series([1.0, np.nan])) == [1.0, None]
+    assert _column_values(pd.Series(['a', None])) == ['a', None]
+    assert _column_values(pd.Series(pd.to_datetime(['2024-01-01', None]))) == [
+        datetime(2024, 1, 1), None
+    ]
+    
+    values = _column_values(pd.Series([1, 2]))
+    assert values == [1, 2]
+    assert all(type(value) is int for value in values)